@@ -1,14 +1,43 @@
-import google.generativeai as genai
 import os
 import json
 import logging
 
 from dotenv import load_dotenv
 
+import metrics
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 load_dotenv()
 
+# Returned when the LLM cannot give a usable answer
+DEFAULT_ANALYSIS = {"industries": ["General Management"], "sectors": [], "areas_of_interest": []}
+
+def default_analysis():
+    return {key: list(value) for key, value in DEFAULT_ANALYSIS.items()}
+
+def is_llm_fallback(prof):
+    """The failure default carries no information about the professor."""
+    return (not prof.sectors and not prof.areas_of_interest
+            and [i.name for i in prof.industries] == DEFAULT_ANALYSIS["industries"])
+
+def has_llm_labels(prof):
+    """Labelled by the LLM (rows from before label_source existed count too)."""
+    return prof.label_source != "local" and bool(prof.industries) and not is_llm_fallback(prof)
+
+_model = None
+
+def get_model(api_key):
+    """Returns the Gemini model, importing and configuring the SDK on first use."""
+    global _model
+    if _model is None:
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        # Use a currently supported model
+        _model = genai.GenerativeModel('gemini-2.0-flash')
+    return _model
+
+@metrics.timed("analyze_bio_for_industries")
 def analyze_bio_for_industries(bio_text):
     """
     Uses Gemini to extract industries from a professor's bio.
@@ -19,9 +48,7 @@ def analyze_bio_for_industries(bio_text):
         logging.warning("GEMINI_API_KEY not found. Returning empty list.")
         return []
 
-    genai.configure(api_key=api_key)
-    # Use a currently supported model
-    model = genai.GenerativeModel('gemini-2.0-flash')
+    model = get_model(api_key)
 
     prompt = f"""
     Analyze the following academic biography and identify:
@@ -59,10 +86,10 @@ def analyze_bio_for_industries(bio_text):
             
             # Ensure structure
             if not isinstance(result, dict):
-                 result = {"industries": ["General Management"], "sectors": [], "areas_of_interest": []}
+                 result = default_analysis()
                  
             if "industries" not in result or not result["industries"]:
-                 result["industries"] = ["General Management"]
+                 result["industries"] = list(DEFAULT_ANALYSIS["industries"])
                  
             if "sectors" not in result:
                  result["sectors"] = []
@@ -75,10 +102,13 @@ def analyze_bio_for_industries(bio_text):
         except Exception as e:
             if "404" in str(e) and "not found" in str(e):
                 logging.error(f"Model not found (404): {e}. Stopping retries.")
-                return {"industries": ["General Management"], "sectors": [], "areas_of_interest": []}
+                return default_analysis()
             
             wait_time = (2 ** attempt) * 15  # 15s, 30s, 60s
+            if attempt < 2:
+                metrics.incr("llm_retries")
             if "429" in str(e):
+                metrics.incr("llm_429")
                 logging.warning(f"Rate limit hit (429). Waiting {wait_time}s...")
             else:
                 logging.warning(f"Attempt {attempt+1} failed for LLM analysis: {e}. Waiting {wait_time}s...")
@@ -88,7 +118,7 @@ def analyze_bio_for_industries(bio_text):
                 time.sleep(wait_time)
             else:
                 logging.error(f"All attempts failed for LLM analysis. Returning default.")
-                return {"industries": ["General Management"], "sectors": [], "areas_of_interest": []}
+                return default_analysis()
 
 if __name__ == "__main__":
     # Test
@@ -1,7 +1,10 @@
+import os
 import streamlit as st
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from database import Professor, Industry, Sector, professor_industries, professor_sectors, init_db
+from database import Professor, init_db
+import similarity
+import snapshot
+
+DB_PATH = "data/faculty_v2.db"
 
 # Database connection
 def fix_db_paths(session):
@@ -30,31 +33,64 @@ def get_db_session():
 
 st.set_page_config(page_title="IESE Faculty Explorer", layout="wide")
 
+def is_stale(path, db_mtime):
+    return not os.path.exists(path) or os.path.getmtime(path) < db_mtime
+
+@st.cache_resource
+def prepare_read_models(db_mtime):
+    """
+    Migrates image paths and rebuilds the snapshot/index when missing or older than the DB
+    (e.g. after transfer.py load or a manual edit); db_mtime is the cache key, so this reruns
+    only when the DB file changes.
+    """
+    session = get_db_session()
+    try:
+        if is_stale(snapshot.SNAPSHOT_PATH, db_mtime):
+            snapshot.publish_snapshot(session)
+        if is_stale(similarity.INDEX_PATH, db_mtime):
+            similarity.build_index(session)
+    finally:
+        session.close()
+
+@st.cache_data
+def load_professors(mtime):
+    """Loads the snapshot; mtime is only the cache key so a newly published file is picked up."""
+    return snapshot.load_snapshot()
+
+@st.cache_resource
+def load_similarity_index(mtime):
+    """Loads the similarity index; mtime is only the cache key so a rebuilt file is picked up."""
+    return similarity.load_index()
+
+def matches_any(column, selected):
+    """Vectorized "row has at least one of the selected names" over a list-valued column."""
+    exploded = column.explode()
+    return exploded.isin(selected).groupby(level=0).any().reindex(column.index, fill_value=False)
+
 st.title("IESE Faculty Explorer v1.1 (Fixes)")
 
-session = get_db_session()
+prepare_read_models(os.path.getmtime(DB_PATH) if os.path.exists(DB_PATH) else 0)
+df = load_professors(os.path.getmtime(snapshot.SNAPSHOT_PATH))
+similarity_index = load_similarity_index(os.path.getmtime(similarity.INDEX_PATH))
+professor_names = dict(zip(df["id"], df["name"]))
 
 # Sidebar Filters
 st.sidebar.header("Filters")
 
 # Industry Filter
-all_industries = session.query(Industry).all()
-industry_names = [i.name for i in all_industries]
+industry_names = sorted(df["industries"].explode().dropna().unique())
 selected_industries = st.sidebar.multiselect("Select Industries", industry_names)
 
 # Sector Filter
-all_sectors = session.query(Sector).all()
-sector_names = [s.name for s in all_sectors]
+sector_names = sorted(df["sectors"].explode().dropna().unique())
 selected_sectors = st.sidebar.multiselect("Select Sectors", sector_names)
 
 # Department Filter
-all_departments = session.query(Professor.department).distinct().all()
-dept_names = [d[0] for d in all_departments if d[0]]
+dept_names = sorted(d for d in df["department"].dropna().unique() if d)
 selected_depts = st.sidebar.multiselect("Select Departments", dept_names)
 
 # Debug: File System Check
 with st.sidebar.expander("Debug: File System"):
-    import os
     if os.path.exists("data/images"):
         files = os.listdir("data/images")
         st.write(f"Found {len(files)} images in data/images")
@@ -65,45 +101,47 @@ with st.sidebar.expander("Debug: File System"):
     
     st.write(f"CWD: {os.getcwd()}")
 
-# Query
-query = session.query(Professor)
+# Filter
+mask = df["id"].notna()
 
 if selected_industries:
-    query = query.join(Professor.industries).filter(Industry.name.in_(selected_industries))
+    mask &= matches_any(df["industries"], selected_industries)
 
 if selected_sectors:
-    query = query.join(Professor.sectors).filter(Sector.name.in_(selected_sectors))
+    mask &= matches_any(df["sectors"], selected_sectors)
 
 if selected_depts:
-    query = query.filter(Professor.department.in_(selected_depts))
+    mask &= df["department"].isin(selected_depts)
 
-professors = query.distinct().all()
+professors = df[mask]
 
 st.write(f"Found {len(professors)} professors.")
 
 # Display Grid
 cols = st.columns(3)
-for idx, prof in enumerate(professors):
+for idx, prof in enumerate(professors.itertuples(index=False)):
     with cols[idx % 3]:
         with st.container(border=True):
             if prof.image_url:
-                # Force normalize path just in case DB is still wrong
-                image_path = prof.image_url.replace("\\", "/")
-                st.image(image_path, width=150)
+                st.image(prof.image_url, width=150)
             st.subheader(prof.name)
             st.caption(prof.title)
             st.write(f"**Dept:** {prof.department}")
             
-            industries = [i.name for i in prof.industries]
-            if industries:
-                st.write(f"**Industries:** {', '.join(industries)}")
+            if prof.industries:
+                st.write(f"**Industries:** {', '.join(prof.industries)}")
             
-            sectors = [s.name for s in prof.sectors]
-            if sectors:
-                st.write(f"**Sectors:** {', '.join(sectors)}")
+            if prof.sectors:
+                st.write(f"**Sectors:** {', '.join(prof.sectors)}")
             
             with st.expander("Bio"):
                 st.write(prof.bio[:500] + "..." if prof.bio else "No bio available.")
                 st.link_button("View Profile", prof.url)
 
-session.close()
+            with st.expander("Similar professors"):
+                similar = similarity.similar_professors(similarity_index, prof.id, k=5)
+                if similar:
+                    for other_id, score in similar:
+                        st.write(f"{professor_names.get(other_id, 'Unknown')} ({score:.2f})")
+                else:
+                    st.write("No similar professors found.")
@@ -0,0 +1,76 @@
+"""
+Import-time regression check for the scraper entry points.
+
+    python src/bench_imports.py
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for
+each module, reports the cumulative import time and fails if it exceeds the
+budget or if a heavy dependency was pulled in at import time.
+"""
+import os
+import re
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Module -> budget in milliseconds (best of RUNS)
+BUDGETS = {
+    "scraper": 150,
+    "analyzer": 100,
+    "metrics": 50,
+}
+
+# Must only be imported by the step that needs them
+HEAVY_MODULES = ["google.generativeai", "PIL", "bs4", "sqlalchemy", "numpy", "pandas", "requests"]
+
+RUNS = 5
+
+LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure(module):
+    """Returns (cumulative_ms, imported_module_names) for one cold import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        imported.add(name)
+        if name == module:
+            cumulative = int(match.group(2)) / 1000
+    return cumulative, imported
+
+
+def main():
+    failures = []
+    for module, budget in BUDGETS.items():
+        best = None
+        for _ in range(RUNS):
+            elapsed, imported = measure(module)
+            best = elapsed if best is None else min(best, elapsed)
+
+        heavy = [h for h in HEAVY_MODULES if h in imported]
+        status = "ok" if best <= budget and not heavy else "FAIL"
+        print(f"{module:<10} {best:8.1f} ms  (budget {budget} ms)  {status}")
+        if best > budget:
+            failures.append(f"{module} took {best:.1f} ms, budget is {budget} ms")
+        if heavy:
+            failures.append(f"{module} eagerly imports {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f"  - {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
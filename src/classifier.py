@@ -0,0 +1,251 @@
+"""
+Local first stage of the bio analysis.
+
+Scores a bio against every known industry/sector/area with TF-IDF centroids
+built from the professors the LLM has already labelled, plus a keyword match
+on the label names. With scraper.py --local, bios whose best industry scores
+above the threshold get their industries locally, with no sectors or areas;
+the rest go to Gemini. Professors the LLM already labelled are never
+relabelled locally.
+
+    python src/classifier.py report              # agreement with the LLM labels
+    python src/classifier.py report --folds 10
+"""
+import argparse
+import logging
+import os
+import sys
+
+import numpy as np
+
+from analyzer import has_llm_labels
+from preprocess import prepare_analysis_text
+from similarity import fit_idf, normalize, tfidf, tokenize
+
+KINDS = ["industries", "sectors", "areas_of_interest"]
+# Kinds written for a locally labelled bio. Sector and area predictions agree
+# with the LLM too rarely (see the report's sec J / area J) and are left empty.
+LOCAL_KINDS = ["industries"]
+# Same caps the LLM prompt asks for
+LIMITS = {"industries": 3, "sectors": 5, "areas_of_interest": 5}
+
+DEFAULT_THRESHOLD = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.45"))
+KEYWORD_WEIGHT = 0.15
+# Labels scoring within this fraction of the best one are returned as well
+RELATIVE_CUTOFF = 0.8
+# Labels seen on fewer professors than this are left to the LLM
+MIN_SUPPORT = 2
+
+
+def _presence(token_lists, index):
+    """Binary docs x terms matrix."""
+    matrix = np.zeros((len(token_lists), len(index)), dtype=np.float32)
+    for r, tokens in enumerate(token_lists):
+        cols = [index[t] for t in set(tokens) if t in index]
+        matrix[r, cols] = 1
+    return matrix
+
+
+class LocalClassifier:
+    def __init__(self, vocab, idf, keyword_vocab, labels, docs, memberships, keywords, keys=None):
+        self.vocab_index = {t: i for i, t in enumerate(vocab)}
+        self.idf = idf
+        self.keyword_index = {t: i for i, t in enumerate(keyword_vocab)}
+        self.labels = labels            # kind -> list of label names
+        self.docs = docs                # training docs x vocab
+        self.memberships = memberships  # kind -> labels x training docs
+        self.sums = {kind: m @ docs for kind, m in memberships.items()}
+        self.centroids = {kind: normalize(s) for kind, s in self.sums.items()}
+        self.keywords = keywords        # kind -> labels x keyword_vocab, rows sum to 1
+        self.row_of = {k: i for i, k in enumerate(keys or []) if k}
+
+    @classmethod
+    def fit(cls, texts, label_sets, keys=None):
+        """
+        texts: list of analysis texts; label_sets: matching list of {kind: [names]};
+        keys: optional matching ids (profile URLs) that predict() can leave out.
+        """
+        token_lists = [tokenize(t) for t in texts]
+        vocab, idf = fit_idf(token_lists)
+
+        labels, memberships, keyword_rows = {}, {}, {}
+        docs = tfidf(token_lists, {t: i for i, t in enumerate(vocab)}, idf)
+        for kind in KINDS:
+            counts = {}
+            for label_set in label_sets:
+                for name in label_set.get(kind, []):
+                    counts[name] = counts.get(name, 0) + 1
+            names = sorted(n for n, c in counts.items() if c >= MIN_SUPPORT)
+            name_index = {n: i for i, n in enumerate(names)}
+
+            membership = np.zeros((len(names), len(texts)), dtype=np.float32)
+            for doc, label_set in enumerate(label_sets):
+                for name in label_set.get(kind, []):
+                    if name in name_index:
+                        membership[name_index[name], doc] = 1
+
+            labels[kind] = names
+            memberships[kind] = membership
+            keyword_rows[kind] = [tokenize(n) for n in names]
+
+        keyword_vocab = sorted({t for rows in keyword_rows.values() for tokens in rows for t in tokens})
+        keyword_index = {t: i for i, t in enumerate(keyword_vocab)}
+        keywords = {}
+        for kind in KINDS:
+            matrix = _presence(keyword_rows[kind], keyword_index)
+            totals = matrix.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1
+            keywords[kind] = matrix / totals
+
+        return cls(vocab, idf, keyword_vocab, labels, docs, memberships, keywords, keys)
+
+    @classmethod
+    def from_session(cls, session):
+        """Trains on the professors the LLM labelled (not local or fallback labels)."""
+        texts, label_sets, urls = training_data(session)
+        logging.info(f"Training local classifier on {len(texts)} LLM-labelled bios.")
+        return cls.fit(texts, label_sets, urls)
+
+    def _centroids(self, kind, exclude=None):
+        """Label centroids, without the training bio keyed by exclude if there is one."""
+        row = self.row_of.get(exclude)
+        if row is None:
+            return self.centroids[kind]
+        return normalize(self.sums[kind] - np.outer(self.memberships[kind][:, row], self.docs[row]))
+
+    def scores(self, texts, exclude=None):
+        """Returns {kind: docs x labels} scores in [0, 1]."""
+        token_lists = [tokenize(t) for t in texts]
+        docs = tfidf(token_lists, self.vocab_index, self.idf)
+        present = _presence(token_lists, self.keyword_index)
+        return {
+            kind: (1 - KEYWORD_WEIGHT) * (docs @ self._centroids(kind, exclude).T)
+                  + KEYWORD_WEIGHT * (present @ self.keywords[kind].T)
+            for kind in KINDS
+        }
+
+    def predict(self, texts, exclude=None):
+        """
+        Returns a list of (result, confidence), result shaped like the LLM output.
+        exclude: key of a training bio to leave out, so a professor is not scored
+        against their own labels.
+        """
+        scores = self.scores(texts, exclude)
+        predictions = []
+        for row in range(len(texts)):
+            result = {}
+            for kind in KINDS:
+                names = self.labels[kind]
+                if not names:
+                    result[kind] = []
+                    continue
+                row_scores = scores[kind][row]
+                order = np.argsort(-row_scores)[:LIMITS[kind]]
+                best = row_scores[order[0]]
+                result[kind] = [names[i] for i in order
+                                if row_scores[i] > 0 and row_scores[i] >= RELATIVE_CUTOFF * best]
+            industry_scores = scores["industries"][row]
+            confidence = float(industry_scores.max()) if industry_scores.size else 0.0
+            predictions.append((result, confidence))
+        return predictions
+
+    def classify(self, text, threshold=DEFAULT_THRESHOLD, exclude=None):
+        """Returns (result, confidence); result is None when the LLM should decide."""
+        result, confidence = self.predict([text], exclude)[0]
+        if confidence < threshold or not result["industries"]:
+            return None, confidence
+        return {kind: result[kind] if kind in LOCAL_KINDS else [] for kind in KINDS}, confidence
+
+
+def training_data(session):
+    from sqlalchemy.orm import selectinload
+    from database import Professor
+
+    professors = (
+        session.query(Professor)
+        .options(selectinload(Professor.industries),
+                 selectinload(Professor.sectors),
+                 selectinload(Professor.areas_of_interest))
+        .filter(Professor.bio != None)
+        .order_by(Professor.id)
+        .all()
+    )
+    texts, label_sets, urls = [], [], []
+    for prof in professors:
+        if not has_llm_labels(prof):
+            continue
+        urls.append(prof.url)
+        texts.append(prof.analysis_text or prepare_analysis_text(prof.bio))
+        label_sets.append({
+            "industries": [i.name for i in prof.industries],
+            "sectors": [s.name for s in prof.sectors],
+            "areas_of_interest": [a.name for a in prof.areas_of_interest],
+        })
+    return texts, label_sets, urls
+
+
+def _jaccard(a, b):
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def agreement_report(texts, label_sets, folds=5, thresholds=None):
+    """
+    Cross-validated agreement between local predictions and the LLM labels.
+    For each threshold: share of bios resolved locally, and on those, how often
+    the top industry is one the LLM chose and the mean Jaccard overlap per kind
+    (sectors and areas are only predicted here, never written; see LOCAL_KINDS).
+    """
+    thresholds = thresholds or [0.3, 0.35, 0.4, 0.45, 0.5, 0.55, 0.6, 0.7]
+    folds = max(2, min(folds, len(texts)))
+    predictions = [None] * len(texts)
+    for fold in range(folds):
+        train = [i for i in range(len(texts)) if i % folds != fold]
+        test = [i for i in range(len(texts)) if i % folds == fold]
+        model = LocalClassifier.fit([texts[i] for i in train], [label_sets[i] for i in train])
+        for i, prediction in zip(test, model.predict([texts[i] for i in test])):
+            predictions[i] = prediction
+
+    confidences = np.array([c for _, c in predictions])
+    rows = []
+    for threshold in thresholds:
+        resolved = [i for i in range(len(texts))
+                    if confidences[i] >= threshold and predictions[i][0]["industries"]]
+        row = {"threshold": threshold, "coverage": len(resolved) / max(len(texts), 1), "n": len(resolved)}
+        if resolved:
+            row["top_industry_agreement"] = np.mean(
+                [predictions[i][0]["industries"][0] in label_sets[i]["industries"] for i in resolved])
+            for kind in KINDS:
+                row[kind] = np.mean([_jaccard(predictions[i][0][kind], label_sets[i][kind]) for i in resolved])
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local bio classifier ahead of the LLM.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report_parser = subparsers.add_parser("report", help="Cross-validated agreement with the LLM labels")
+    report_parser.add_argument("--folds", type=int, default=5)
+    report_parser.add_argument("--db", default="sqlite:///data/faculty_v2.db")
+    args = parser.parse_args(argv)
+
+    from database import init_db
+
+    session = init_db(args.db)()
+    texts, label_sets, _ = training_data(session)
+    session.close()
+    print(f"{len(texts)} LLM-labelled bios, {args.folds}-fold cross-validation\n")
+    print(f"{'threshold':>9} {'local':>7} {'n':>4} {'top-1':>6} {'ind J':>6} {'sec J':>6} {'area J':>6}")
+    for row in agreement_report(texts, label_sets, folds=args.folds):
+        if row["n"]:
+            print(f"{row['threshold']:>9.2f} {row['coverage']:>7.0%} {row['n']:>4} "
+                  f"{row['top_industry_agreement']:>6.2f} {row['industries']:>6.2f} "
+                  f"{row['sectors']:>6.2f} {row['areas_of_interest']:>6.2f}")
+        else:
+            print(f"{row['threshold']:>9.2f} {row['coverage']:>7.0%} {row['n']:>4}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
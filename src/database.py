@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, ForeignKey, Table
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, Text, ForeignKey, Table
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 
 Base = declarative_base()
@@ -30,6 +30,14 @@ class Professor(Base):
     title = Column(String)
     department = Column(String)
     bio = Column(Text)
+    # Bio with boilerplate and publication lists stripped; this is what the LLM sees
+    analysis_text = Column(Text)
+    # Token counts of the raw bio and the analysis text, estimated at ~4 characters
+    # per token (preprocess.estimate_tokens), not measured by the model
+    est_bio_tokens = Column(Integer)
+    est_analysis_tokens = Column(Integer)
+    # Who assigned the industries/sectors/areas: 'llm' or 'local' (NULL for older rows)
+    label_source = Column(String)
     image_url = Column(String)
     
     industries = relationship('Industry', secondary=professor_industries, back_populates='professors')
@@ -83,8 +91,20 @@ def init_db(db_path='sqlite:///data/faculty_v2.db'):
 
     engine = create_engine(db_path)
     Base.metadata.create_all(engine)
+    add_missing_columns(engine)
     return sessionmaker(bind=engine)
 
+def add_missing_columns(engine):
+    """create_all() does not alter existing tables, so add new (nullable) columns here."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
 if __name__ == "__main__":
     # Initialize DB when run directly
     import os
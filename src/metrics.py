@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Metrics are off unless SCRAPER_METRICS (or scraper.py --metrics) points at a
+# JSON-lines output file, e.g. python src/scraper.py --metrics data/metrics.jsonl
+METRICS_PATH = os.getenv("SCRAPER_METRICS")
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+_enabled = bool(METRICS_PATH)
+_durations = {}   # stage -> list of durations for the whole run
+_totals = {}      # counter -> total for the whole run
+_item = None      # record for the item currently being processed
+_file = None
+
+
+def configure(path):
+    """Turns metrics on (or off with path=None) after import."""
+    global METRICS_PATH, _enabled, _file
+    if _file:
+        _file.close()
+        _file = None
+    METRICS_PATH = path
+    _enabled = bool(path)
+
+
+def _write(record):
+    global _file
+    if _file is None:
+        folder = os.path.dirname(METRICS_PATH)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # Always UTF-8, regardless of how stdout is redirected
+        _file = open(METRICS_PATH, "a", encoding="utf-8")
+    _file.write(json.dumps(record) + "\n")
+    _file.flush()
+
+
+def start_item(key):
+    """Starts a per-item record (one line in the metrics file)."""
+    global _item
+    if not _enabled:
+        return
+    _item = {"type": "item", "key": key, "ts": time.time(), "durations": {}, "counters": {}}
+
+
+def end_item(**fields):
+    """Writes the current item record, with any extra fields attached."""
+    global _item
+    if not _enabled or _item is None:
+        return
+    _item.update(fields)
+    _write(_item)
+    _item = None
+
+
+def incr(name, value=1):
+    """Adds value to a counter (bytes, retries, cache_hits, http_429...)."""
+    if not _enabled:
+        return
+    _totals[name] = _totals.get(name, 0) + value
+    if _item is not None:
+        _item["counters"][name] = _item["counters"].get(name, 0) + value
+
+
+def observe(stage, seconds):
+    if not _enabled:
+        return
+    _durations.setdefault(stage, []).append(seconds)
+    if _item is not None:
+        _item["durations"][stage] = round(_item["durations"].get(stage, 0) + seconds, 6)
+
+
+@contextmanager
+def timer(stage):
+    """Times a block of code under the given stage name."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def timed(stage):
+    """Decorator version of timer()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summary():
+    """Builds per-stage stats and a bucketed histogram for the run so far."""
+    stages = {}
+    for stage, values in _durations.items():
+        values = sorted(values)
+        histogram = {}
+        for v in values:
+            bucket = next((f"<={b}s" for b in BUCKETS if v <= b), f">{BUCKETS[-1]}s")
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+        stages[stage] = {
+            "count": len(values),
+            "total": round(sum(values), 4),
+            "mean": round(sum(values) / len(values), 4),
+            "p50": round(_percentile(values, 50), 4),
+            "p90": round(_percentile(values, 90), 4),
+            "p99": round(_percentile(values, 99), 4),
+            "max": round(values[-1], 4),
+            "histogram": histogram,
+        }
+    return {"type": "summary", "ts": time.time(), "stages": stages, "counters": dict(_totals)}
+
+
+def write_summary():
+    """Writes the run summary to the metrics file and logs it."""
+    global _file
+    if not _enabled:
+        return
+    result = summary()
+    _write(result)
+    for stage, stats in result["stages"].items():
+        logging.info(f"[metrics] {stage}: n={stats['count']} mean={stats['mean']}s p90={stats['p90']}s max={stats['max']}s")
+    if result["counters"]:
+        logging.info(f"[metrics] counters: {result['counters']}")
+    _file.close()
+    _file = None
@@ -0,0 +1,126 @@
+import math
+import re
+
+# Whole lines that carry no information about the professor
+BOILERPLATE_LINES = [
+    re.compile(r"^download( complete| full)? cv\.?$", re.IGNORECASE),
+    re.compile(r"^(read more|view profile|back to faculty|share)$", re.IGNORECASE),
+]
+
+# "CV here" link text that gets glued into a sentence ("...see his CVhere.")
+CV_LINK = re.compile(r"\bCV\s*here\b", re.IGNORECASE)
+
+# Blocks that run to the end of the bio once they start
+BOILERPLATE_BLOCKS = [
+    re.compile(r"^transparency statement on data processing", re.IGNORECASE),
+]
+
+# Headings that introduce a publication list ("His Spanish books include:")
+PUBLICATION_HEADING = re.compile(
+    r"^((selected|recent|main) )?(publications|books|articles|papers)\b.{0,40}$"
+    r"|\b(books|publications|articles)\b[^.]{0,40}\binclude:?$",
+    re.IGNORECASE,
+)
+
+# A citation such as "(Ariel, 2018)" or "(Price Management, 1999)"
+CITATION = re.compile(r"\([^()]{0,150}?\b(19|20)\d{2}\)")
+MIN_CITATIONS = 2
+
+# A sentence naming several journals ("published in the Journal of X, Y Review...")
+JOURNAL = re.compile(r"(Journal|Review|Quarterly|Science|Econometrica)")
+MIN_JOURNALS = 3
+
+URL = re.compile(r"https?://\S+|www\.\S+")
+BULLET = ("•", "*", "-")
+
+
+def estimate_tokens(text):
+    """Gemini's rule of thumb: about four characters per token."""
+    return math.ceil(len(text or "") / 4)
+
+
+def _sentences(line):
+    """Splits on sentence ends outside parentheses, so "(Title. Subtitle, 2020)" stays whole."""
+    sentences = []
+    start = depth = 0
+    for i, char in enumerate(line):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(0, depth - 1)
+        elif char in ".!?" and depth == 0 and (i + 1 == len(line) or line[i + 1] == " "):
+            sentences.append(line[start:i + 1].strip())
+            start = i + 1
+    if line[start:].strip():
+        sentences.append(line[start:].strip())
+    return sentences
+
+
+def _strip_sentences(line):
+    # Pointers elsewhere ("visit her blog: https://...") and citation/journal lists
+    kept = []
+    in_citations = False
+    for sentence in _sentences(line):
+        citations = len(CITATION.findall(sentence))
+        # Titles inside a list can contain full stops; short fragments stay in the list
+        if citations >= MIN_CITATIONS or (in_citations and (citations or len(sentence) < 40)):
+            in_citations = True
+            continue
+        in_citations = False
+        if URL.search(sentence) or CV_LINK.search(sentence):
+            continue
+        if len(JOURNAL.findall(sentence)) >= MIN_JOURNALS:
+            continue
+        kept.append(sentence)
+    return " ".join(kept)
+
+
+def prepare_analysis_text(bio):
+    """
+    Reduces a scraped bio to the text worth sending to the LLM: whitespace is
+    collapsed, repeated lines, CV links, privacy notices and publication,
+    citation or journal lists are dropped. The raw bio is left untouched.
+    """
+    lines = []
+    seen = set()
+    in_publication_list = False
+
+    for raw_line in (bio or "").splitlines():
+        line = " ".join(raw_line.split())
+        if not line:
+            continue
+
+        if any(p.search(line) for p in BOILERPLATE_BLOCKS):
+            break
+        if any(p.search(line) for p in BOILERPLATE_LINES):
+            continue
+
+        if PUBLICATION_HEADING.search(line):
+            in_publication_list = True
+            continue
+        if in_publication_list:
+            if line.startswith(BULLET):
+                continue
+            in_publication_list = False
+
+        line = _strip_sentences(line)
+        if not line:
+            continue
+
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+
+    return "\n".join(lines)
+
+
+def preprocess_bio(bio):
+    """Returns the analysis text and estimated token counts for the raw and reduced bio."""
+    analysis_text = prepare_analysis_text(bio)
+    return {
+        "analysis_text": analysis_text,
+        "est_analysis_tokens": estimate_tokens(analysis_text),
+        "est_bio_tokens": estimate_tokens(bio),
+    }
@@ -1,14 +1,15 @@
 import sqlite3
 import os
+import sys
 
-DB_PATH = "data/faculty.db"
+DB_PATH = "data/faculty_v2.db"
 
-def review_industries():
-    if not os.path.exists(DB_PATH):
-        print(f"Database not found at {DB_PATH}")
+def review_industries(db_path=DB_PATH):
+    if not os.path.exists(db_path):
+        print(f"Database not found at {db_path}")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     print("--- Professor Industries Review ---")
@@ -45,4 +46,5 @@ def review_industries():
     conn.close()
 
 if __name__ == "__main__":
-    review_industries()
+    # Optional path argument: python src/review_industries.py data/staging.db
+    review_industries(sys.argv[1] if len(sys.argv) > 1 else DB_PATH)
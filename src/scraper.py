@@ -1,36 +1,84 @@
-import requests
-from bs4 import BeautifulSoup
 import time
 import logging
 import sys
 import os
-from PIL import Image
-from io import BytesIO
 import re
+import json
+import argparse
+
+import metrics
+from preprocess import preprocess_bio, prepare_analysis_text
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+from analyzer import analyze_bio_for_industries, has_llm_labels
+
 BASE_URL = "https://www.iese.edu/search/professors/"
 
+# Heavy dependencies (requests, BeautifulSoup, PIL, SQLAlchemy, Gemini) are
+# imported on first use, so each subcommand only pays for what it needs.
+_scheduler = None
+_session = None
+_classifier = None
+
+# Local pre-classifier settings (from --local / --local-threshold); a None
+# threshold means classifier.DEFAULT_THRESHOLD
+use_local = False
+local_threshold = None
+
+def get_scheduler():
+    """Returns the shared per-host politeness scheduler, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        from throttle import HostScheduler
+        # Adapts request spacing to latency, errors, Retry-After and robots.txt Crawl-delay
+        _scheduler = HostScheduler()
+    return _scheduler
+
+def get_session():
+    """Returns the shared DB session, connecting on first use."""
+    global _session
+    if _session is None:
+        from database import init_db
+        Session = init_db()
+        _session = Session()
+    return _session
+
+def get_classifier():
+    """Returns the local pre-classifier, trained from the DB on first use (None if disabled)."""
+    global _classifier
+    if not use_local:
+        return None
+    if _classifier is None:
+        from classifier import LocalClassifier
+        _classifier = LocalClassifier.from_session(get_session())
+    return _classifier
+
+@metrics.timed("get_soup")
 def get_soup(url):
     """Helper to fetch URL and return BeautifulSoup object."""
+    from bs4 import BeautifulSoup
+
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_scheduler().get(url, timeout=10)
         response.raise_for_status()
+        metrics.incr("page_bytes", len(response.content))
         return BeautifulSoup(response.content, 'html.parser')
     except Exception as e:
         logging.error(f"Error fetching {url}: {e}")
         return None
 
+@metrics.timed("process_image")
 def process_image(image_url, professor_name):
     """Downloads, crops, and saves the image locally."""
+    from io import BytesIO
+    from PIL import Image
+
     try:
-        response = requests.get(image_url, timeout=10)
+        response = get_scheduler().get(image_url, timeout=10)
         response.raise_for_status()
+        metrics.incr("image_bytes", len(response.content))
         
         img = Image.open(BytesIO(response.content))
         
@@ -124,8 +172,6 @@ def get_all_professor_urls(limit=None):
         if page > 50: # Safety break
             logging.info("Hit safety limit of 50 pages.")
             break
-            
-        time.sleep(1) 
 
     return list(set(professor_urls))
 
@@ -281,17 +327,25 @@ def scrape_professor_details(url):
     except Exception as e:
         logging.error(f"Error parsing profile {url}: {e}")
 
-    return data
-
-from database import init_db, Professor, Industry, Sector, AreaOfInterest
-from analyzer import analyze_bio_for_industries
+    return preprocess_professor(data)
 
-# Initialize DB Session
-Session = init_db()
-session = Session()
+def preprocess_professor(data):
+    """Adds the reduced analysis text and its estimated token counts (no-op if already present)."""
+    if 'est_analysis_tokens' not in data:
+        data.update(preprocess_bio(data.get('bio')))
+        metrics.incr("est_bio_tokens", data['est_bio_tokens'])
+        metrics.incr("est_analysis_tokens", data['est_analysis_tokens'])
+    return data
 
+@metrics.timed("save_professor")
 def save_professor(data):
-    """Saves professor data and industries to the database."""
+    """
+    Saves professor data and industries to the database.
+    Uses data["analysis"] when the analyze step already ran, otherwise analyzes the bio.
+    """
+    from database import Professor, Industry, Sector, AreaOfInterest
+
+    session = get_session()
     try:
         # Check if exists
         prof = session.query(Professor).filter_by(url=data['url']).first()
@@ -307,12 +361,28 @@ def save_professor(data):
         prof.name = data['name']
         prof.title = data['title']
         prof.department = data['department']
+        # Rows saved before preprocessing existed only have the bio to compare against
+        previous_text = prof.analysis_text or (prepare_analysis_text(prof.bio) if prof.bio else None)
         prof.bio = data['bio']
+        preprocess_professor(data)
+        prof.analysis_text = data['analysis_text']
+        prof.est_bio_tokens = data['est_bio_tokens']
+        prof.est_analysis_tokens = data['est_analysis_tokens']
         prof.image_url = data['image_url']
         
         # Analyze Industries & Sectors
-        if data['bio']:
-            analysis_result = analyze_bio_for_industries(data['bio'])
+        llm_labelled = bool(data['bio']) and has_llm_labels(prof)
+        if llm_labelled and keeps_llm_labels(data, previous_text):
+            logging.info(f"Keeping the existing LLM labels for {data['name']}")
+            if not data.get('analysis'):
+                # Unchanged analysis text: the stored labels stand in for an LLM call
+                metrics.incr("cache_hits")
+        elif data['bio']:
+            if not data.get('analysis'):
+                # Never replace LLM labels with a local guess
+                analyze_professor(data, local=not llm_labelled)
+            analysis_result = data['analysis']
+            prof.label_source = data.get('label_source')
             
             industry_names = analysis_result.get("industries", [])
             sector_names = analysis_result.get("sectors", [])
@@ -359,27 +429,249 @@ def save_professor(data):
         logging.error(f"Error saving {data['name']}: {e}")
         session.rollback()
 
-if __name__ == "__main__":
-    # Allow passing a limit argument: python scraper.py 5
-    limit = int(sys.argv[1]) if len(sys.argv) > 1 else None
-    
+def keeps_llm_labels(data, previous_text):
+    """
+    Whether an LLM-labelled professor should keep those labels: the analysis
+    text is unchanged (nothing new to ask), or the new labels are only local.
+    """
+    if data.get('analysis'):
+        return data.get('label_source') == 'local'
+    return previous_text == data['analysis_text']
+
+def analyze_text(text, url=None, local=True):
+    """
+    Labels a bio, trying the local classifier (when enabled) before the LLM.
+    Returns (result, source) with source 'local' or 'llm'.
+    """
+    from analyzer import default_analysis
+
+    classifier = get_classifier() if local else None
+    if classifier:
+        from classifier import DEFAULT_THRESHOLD
+
+        threshold = DEFAULT_THRESHOLD if local_threshold is None else local_threshold
+        # Leave the professor's own labels out of the centroids
+        result, confidence = classifier.classify(text, threshold, exclude=url)
+        if result:
+            metrics.incr("local_resolved")
+            logging.info(f"Resolved locally (confidence {confidence:.2f})")
+            return result, 'local'
+
+    metrics.incr("llm_calls")
+    return analyze_bio_for_industries(text) or default_analysis(), 'llm'
+
+def analyze_professor(data, local=True):
+    """Adds the industry analysis of the bio to the scraped record (local=False: LLM only)."""
+    preprocess_professor(data)
+    if data.get('bio') and not data.get('analysis'):
+        data['analysis'], data['label_source'] = analyze_text(
+            data['analysis_text'] or data['bio'], data.get('url'), local=local)
+    return data
+
+def cmd_preprocess(args):
+    """Fills in analysis_text and the token estimates for professors already in the database."""
+    from database import Professor
+
+    session = get_session()
+    query = session.query(Professor)
+    if not args.all:
+        query = query.filter((Professor.analysis_text == None) | (Professor.est_bio_tokens == None))
+    bio_tokens = analysis_tokens = count = 0
+    for prof in query:
+        result = preprocess_bio(prof.bio)
+        prof.analysis_text = result['analysis_text']
+        prof.est_bio_tokens = result['est_bio_tokens']
+        prof.est_analysis_tokens = result['est_analysis_tokens']
+        bio_tokens += result['est_bio_tokens']
+        analysis_tokens += result['est_analysis_tokens']
+        count += 1
+    session.commit()
+    saved = 1 - analysis_tokens / bio_tokens if bio_tokens else 0
+    logging.info(f"Preprocessed {count} bios: {bio_tokens} -> {analysis_tokens} estimated tokens ({saved:.0%} less)")
+
+def publish_read_models():
+    """Updates the similarity index and the explorer snapshot from the DB."""
+    import similarity
+    import snapshot
+
+    session = get_session()
+    # Re-vectorize only the professors whose bio or taxonomy changed
+    try:
+        similarity.build_index(session)
+    except Exception as e:
+        logging.error(f"Error updating similarity index: {e}")
+
+    # Publish the denormalized read model for the explorer
+    try:
+        snapshot.publish_snapshot(session)
+    except Exception as e:
+        logging.error(f"Error publishing snapshot: {e}")
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def read_urls(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def cmd_discover(args):
+    urls = get_all_professor_urls(limit=args.limit)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.writelines(f"{url}\n" for url in urls)
+        logging.info(f"Wrote {len(urls)} URLs to {args.out}")
+    else:
+        for url in urls:
+            print(url)
+
+def cmd_fetch(args):
+    urls = read_urls(args.urls) if args.urls else get_all_professor_urls(limit=args.limit)
+    if args.limit:
+        urls = urls[:args.limit]
+    with open(args.out, "w", encoding="utf-8") as f:
+        for i, url in enumerate(urls):
+            logging.info(f"Fetching {i+1}/{len(urls)}: {url}")
+            metrics.start_item(url)
+            details = scrape_professor_details(url)
+            if details:
+                f.write(json.dumps(details, ensure_ascii=False) + "\n")
+                f.flush()
+            metrics.end_item(ok=bool(details))
+
+def cmd_analyze(args):
+    with open(args.out, "w", encoding="utf-8") as f:
+        for data in read_jsonl(args.input):
+            metrics.start_item(data['url'])
+            f.write(json.dumps(analyze_professor(data), ensure_ascii=False) + "\n")
+            f.flush()
+            metrics.end_item()
+
+def cmd_save(args):
+    for data in read_jsonl(args.input):
+        metrics.start_item(data['url'])
+        save_professor(data)
+        metrics.end_item()
+    publish_read_models()
+
+def cmd_report(args):
+    from sqlalchemy import func
+    from database import Professor, Industry, Sector, AreaOfInterest, professor_industries
+
+    session = get_session()
+    print(f"Professors: {session.query(Professor).count()}")
+    print(f"  with bio: {session.query(Professor).filter(Professor.bio != None, Professor.bio != '').count()}")
+    print(f"  with image: {session.query(Professor).filter(Professor.image_url != None, Professor.image_url != '').count()}")
+    print(f"Industries: {session.query(Industry).count()}")
+    print(f"Sectors: {session.query(Sector).count()}")
+    print(f"Areas of interest: {session.query(AreaOfInterest).count()}")
+    bio_tokens, analysis_tokens = session.query(
+        func.sum(Professor.est_bio_tokens), func.sum(Professor.est_analysis_tokens)).one()
+    bio_tokens, analysis_tokens = bio_tokens or 0, analysis_tokens or 0
+    saved = 1 - analysis_tokens / bio_tokens if bio_tokens else 0
+    print(f"Estimated tokens (~4 chars each): bios {bio_tokens}, LLM input {analysis_tokens} ({saved:.0%} less)")
+
+    print("\n--- Top Industries ---")
+    count = func.count(professor_industries.c.professor_id)
+    rows = (session.query(Industry.name, count)
+            .join(professor_industries, Industry.id == professor_industries.c.industry_id)
+            .group_by(Industry.name)
+            .order_by(count.desc())
+            .limit(args.top)
+            .all())
+    for name, n in rows:
+        print(f"{name}: {n}")
+
+def cmd_run(args):
     print("Starting scrape...", flush=True)
     # Pass limit to discovery to avoid fetching all pages if we only need a few
-    urls = get_all_professor_urls(limit=limit)
+    urls = get_all_professor_urls(limit=args.limit)
     print(f"Total unique professors found: {len(urls)}", flush=True)
     
-    if limit:
+    if args.limit:
         # Slice again just in case, though the function should handle it
-        urls = urls[:limit]
-        print(f"Limiting to first {limit} profiles for processing.", flush=True)
+        urls = urls[:args.limit]
+        print(f"Limiting to first {args.limit} profiles for processing.", flush=True)
 
     for i, url in enumerate(urls):
         logging.info(f"Processing {i+1}/{len(urls)}: {url}")
+        metrics.start_item(url)
         details = scrape_professor_details(url)
         if details:
             save_professor(details)
-        time.sleep(0.1) # Small delay to prevent tight loop race conditions
+        metrics.end_item(ok=bool(details))
             
+    publish_read_models()
     print("Scraping complete.", flush=True)
     time.sleep(2) # Ensure the process doesn't exit before the agent captures the output
-    sys.exit(0)
+
+def add_local_arguments(parser):
+    parser.add_argument("--local-threshold", type=float,
+                        help="Confidence needed to label a bio locally (default: $LOCAL_CLASSIFIER_THRESHOLD or 0.45)")
+    parser.add_argument("--local", action="store_true",
+                        help="Give confident bios industries from the local classifier (no sectors/areas) instead of asking the LLM")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Scrape IESE faculty profiles.")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Write per-item timings and a run summary as JSON lines (default: $SCRAPER_METRICS)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Full pipeline: discover, fetch, analyze and save")
+    run_parser.add_argument("--limit", type=int, help="Maximum number of profiles")
+    add_local_arguments(run_parser)
+    run_parser.set_defaults(func=cmd_run)
+
+    discover_parser = subparsers.add_parser("discover", help="List professor profile URLs")
+    discover_parser.add_argument("--limit", type=int, help="Maximum number of URLs")
+    discover_parser.add_argument("--out", help="Write URLs to this file instead of stdout")
+    discover_parser.set_defaults(func=cmd_discover)
+
+    fetch_parser = subparsers.add_parser("fetch", help="Scrape profiles and images to JSON lines")
+    fetch_parser.add_argument("--urls", help="File with one URL per line (default: discover them)")
+    fetch_parser.add_argument("--limit", type=int, help="Maximum number of profiles")
+    fetch_parser.add_argument("--out", required=True, help="Output .jsonl file")
+    fetch_parser.set_defaults(func=cmd_fetch)
+
+    analyze_parser = subparsers.add_parser("analyze", help="Add LLM industry analysis to fetched profiles")
+    analyze_parser.add_argument("input", help="Input .jsonl from fetch")
+    analyze_parser.add_argument("out", help="Output .jsonl")
+    add_local_arguments(analyze_parser)
+    analyze_parser.set_defaults(func=cmd_analyze)
+
+    save_parser = subparsers.add_parser("save", help="Save profiles to the database and publish read models")
+    save_parser.add_argument("input", help="Input .jsonl from fetch or analyze")
+    add_local_arguments(save_parser)
+    save_parser.set_defaults(func=cmd_save)
+
+    preprocess_parser = subparsers.add_parser("preprocess", help="Compute analysis text for bios already in the database")
+    preprocess_parser.add_argument("--all", action="store_true", help="Recompute rows that already have it")
+    preprocess_parser.set_defaults(func=cmd_preprocess)
+
+    report_parser = subparsers.add_parser("report", help="Summarize what is in the database")
+    report_parser.add_argument("--top", type=int, default=10, help="Number of industries to list")
+    report_parser.set_defaults(func=cmd_report)
+
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Keep the old interface working: python scraper.py [limit] [run options]
+    if not argv or argv[0].isdigit():
+        argv = ["run"] + (["--limit", argv[0]] + argv[1:] if argv else [])
+
+    args = build_parser().parse_args(argv)
+    if args.metrics:
+        metrics.configure(args.metrics)
+    global use_local, local_threshold
+    if hasattr(args, "local"):
+        use_local = args.local
+        local_threshold = args.local_threshold
+    args.func(args)
+    metrics.write_summary()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+import hashlib
+import logging
+import os
+import re
+import sys
+
+import numpy as np
+
+from database import init_db, Professor
+from preprocess import prepare_analysis_text
+
+INDEX_PATH = "data/similarity.npz"
+
+# Relative weight of the bio text vs. the industry/sector/area memberships
+TEXT_WEIGHT = 0.7
+TAXONOMY_WEIGHT = 0.3
+
+MAX_TERMS = 5000
+MIN_DF = 2
+# Above this share of changed bios the vocabulary is rebuilt from scratch
+FULL_REBUILD_RATIO = 0.25
+
+STOPWORDS = set("""
+the and for with from that this are was were has have had his her their its into also which who whom
+been being about over under between through during more most other such than then them they these those
+she him our out any all can may not but one two new how what when where while well very own same each
+professor iese business school university phd degree department research teaches teaching taught
+""".split())
+
+TOKEN_RE = re.compile(r"[a-z][a-z\-]{2,}")
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def profile_text(prof):
+    """The bio without page boilerplate, so privacy notices or CV links do not count as shared topics."""
+    return prof.analysis_text or prepare_analysis_text(prof.bio)
+
+
+def bio_hash(prof):
+    """Hash of everything the vector depends on, to detect changed rows."""
+    parts = [profile_text(prof)]
+    parts += sorted(f"i:{i.name}" for i in prof.industries)
+    parts += sorted(f"s:{s.name}" for s in prof.sectors)
+    parts += sorted(f"a:{a.name}" for a in prof.areas_of_interest)
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def taxonomy_terms(prof):
+    return ([f"i:{i.name}" for i in prof.industries]
+            + [f"s:{s.name}" for s in prof.sectors]
+            + [f"a:{a.name}" for a in prof.areas_of_interest])
+
+
+def _count_matrix(docs, vocab_index):
+    """Term-count matrix (docs x vocab) built with a single scatter-add."""
+    rows, cols = [], []
+    for r, terms in enumerate(docs):
+        for t in terms:
+            c = vocab_index.get(t)
+            if c is not None:
+                rows.append(r)
+                cols.append(c)
+    counts = np.zeros((len(docs), len(vocab_index)), dtype=np.float32)
+    if rows:
+        np.add.at(counts, (np.array(rows), np.array(cols)), 1)
+    return counts
+
+
+def normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def tfidf(token_lists, vocab_index, idf):
+    """L2-normalized tf-idf rows (docs x vocab)."""
+    tf = _count_matrix(token_lists, vocab_index)
+    # Sublinear tf dampens long bios that repeat the same words
+    return normalize(np.log1p(tf) * idf)
+
+
+def fit_idf(token_lists):
+    """Terms found in at least MIN_DF docs (most frequent first, capped at MAX_TERMS) and their smoothed idf."""
+    df = {}
+    for tokens in token_lists:
+        for t in set(tokens):
+            df[t] = df.get(t, 0) + 1
+    terms = [t for t, n in df.items() if n >= MIN_DF]
+    terms.sort(key=lambda t: (-df[t], t))
+    vocab = terms[:MAX_TERMS]
+
+    n_docs = max(len(token_lists), 1)
+    idf = np.array([np.log((1 + n_docs) / (1 + df[t])) + 1 for t in vocab], dtype=np.float32)
+    return vocab, idf
+
+
+def _vectorize(bios, taxonomies, vocab, taxonomy_vocab, idf):
+    vocab_index = {t: i for i, t in enumerate(vocab)}
+    tax_index = {t: i for i, t in enumerate(taxonomy_vocab)}
+
+    text = tfidf([tokenize(b) for b in bios], vocab_index, idf)
+    tax = normalize(np.minimum(_count_matrix(taxonomies, tax_index), 1))
+
+    return normalize(np.hstack([text * TEXT_WEIGHT, tax * TAXONOMY_WEIGHT])).astype(np.float32)
+
+
+def _fit_vocabulary(bios, taxonomies):
+    vocab, idf = fit_idf([tokenize(b) for b in bios])
+    taxonomy_vocab = sorted({t for terms in taxonomies for t in terms})
+    return vocab, taxonomy_vocab, idf
+
+
+def load_index(path=INDEX_PATH):
+    """Loads the index as a dict of arrays, or None if it has not been built."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        index = {key: data[key] for key in data.files}
+    index["row_of"] = {int(pid): row for row, pid in enumerate(index["ids"])}
+    return index
+
+
+def save_index(index, path=INDEX_PATH):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    # Write to a temp file and swap, so readers never see a partial index
+    tmp_path = path + ".tmp.npz"
+    np.savez_compressed(tmp_path, **{k: v for k, v in index.items() if k != "row_of"})
+    os.replace(tmp_path, path)
+
+
+def build_index(session, path=INDEX_PATH, full=False):
+    """
+    Builds or incrementally updates the similarity index.
+    Only professors whose bio or taxonomy changed since the last build are
+    re-vectorized, unless too many changed and the vocabulary must be refit.
+    """
+    professors = session.query(Professor).order_by(Professor.id).all()
+    ids = np.array([p.id for p in professors], dtype=np.int64)
+    hashes = np.array([bio_hash(p) for p in professors])
+
+    old = None if full else load_index(path)
+    if old is not None:
+        old_hash = dict(zip(old["ids"].tolist(), old["hashes"].tolist()))
+        changed = [i for i, p in enumerate(professors) if old_hash.get(p.id) != hashes[i]]
+        known_terms = set(old["taxonomy_vocab"].tolist())
+        if len(changed) > FULL_REBUILD_RATIO * max(len(professors), 1):
+            old = None
+        elif any(t not in known_terms for i in changed for t in taxonomy_terms(professors[i])):
+            # A new industry/sector/area has no column in the old taxonomy block
+            logging.info("New taxonomy terms since the last build; refitting the index.")
+            old = None
+        elif not changed and len(old["ids"]) == len(ids):
+            logging.info("Similarity index is up to date.")
+            return old
+
+    if old is None:
+        bios = [profile_text(p) for p in professors]
+        taxonomies = [taxonomy_terms(p) for p in professors]
+        vocab, taxonomy_vocab, idf = _fit_vocabulary(bios, taxonomies)
+        vectors = _vectorize(bios, taxonomies, vocab, taxonomy_vocab, idf)
+        logging.info(f"Rebuilt similarity index: {len(ids)} professors, {len(vocab)} terms.")
+    else:
+        vocab, taxonomy_vocab, idf = old["vocab"].tolist(), old["taxonomy_vocab"].tolist(), old["idf"]
+        vectors = np.zeros((len(ids), old["vectors"].shape[1]), dtype=np.float32)
+        changed_rows = set(changed)
+        keep = [i for i in range(len(professors)) if i not in changed_rows]
+        if keep:
+            vectors[keep] = old["vectors"][[old["row_of"][int(ids[i])] for i in keep]]
+        if changed:
+            vectors[changed] = _vectorize(
+                [profile_text(professors[i]) for i in changed],
+                [taxonomy_terms(professors[i]) for i in changed],
+                vocab, taxonomy_vocab, idf)
+        logging.info(f"Updated similarity index: {len(changed)} of {len(ids)} professors re-vectorized.")
+
+    index = {
+        "ids": ids,
+        "hashes": hashes,
+        "vectors": vectors,
+        "vocab": np.array(vocab, dtype=str),
+        "taxonomy_vocab": np.array(taxonomy_vocab, dtype=str),
+        "idf": np.asarray(idf, dtype=np.float32),
+    }
+    save_index(index, path)
+    index["row_of"] = {int(pid): row for row, pid in enumerate(ids)}
+    return index
+
+
+def similar_professors(index, professor_id, k=5):
+    """Returns the k most similar professors as a list of (professor_id, score)."""
+    row = index["row_of"].get(professor_id)
+    if row is None:
+        return []
+    vectors = index["vectors"]
+    scores = vectors @ vectors[row]
+    scores[row] = -np.inf
+
+    k = min(k, len(scores) - 1)
+    if k <= 0:
+        return []
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return [(int(index["ids"][i]), float(scores[i])) for i in top]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    Session = init_db()
+    session = Session()
+    build_index(session, full="--full" in sys.argv)
+    session.close()
@@ -0,0 +1,91 @@
+import json
+import logging
+import os
+import sqlite3
+
+from sqlalchemy.orm import selectinload
+
+from database import init_db, Professor
+
+SNAPSHOT_PATH = "data/faculty_snapshot.db"
+
+COLUMNS = ["id", "name", "url", "title", "department", "bio", "image_url",
+           "industries", "sectors", "areas_of_interest"]
+LIST_COLUMNS = ["industries", "sectors", "areas_of_interest"]
+
+
+def snapshot_rows(session):
+    """One flat row per professor with the taxonomy names pre-joined."""
+    professors = (
+        session.query(Professor)
+        .options(selectinload(Professor.industries),
+                 selectinload(Professor.sectors),
+                 selectinload(Professor.areas_of_interest))
+        .order_by(Professor.name)
+        .all()
+    )
+    for p in professors:
+        yield (
+            p.id, p.name, p.url, p.title, p.department, p.bio,
+            p.image_url.replace("\\", "/") if p.image_url else None,
+            json.dumps(sorted(i.name for i in p.industries)),
+            json.dumps(sorted(s.name for s in p.sectors)),
+            json.dumps(sorted(a.name for a in p.areas_of_interest)),
+        )
+
+
+def publish_snapshot(session, path=SNAPSHOT_PATH):
+    """
+    Writes the denormalized read model to a new file and swaps it in,
+    so readers always see either the previous or the complete new snapshot.
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("""
+            CREATE TABLE professor_snapshot (
+                id INTEGER PRIMARY KEY, name TEXT, url TEXT, title TEXT, department TEXT,
+                bio TEXT, image_url TEXT, industries TEXT, sectors TEXT, areas_of_interest TEXT
+            )
+        """)
+        conn.executemany(f"INSERT INTO professor_snapshot VALUES ({', '.join('?' * len(COLUMNS))})",
+                         snapshot_rows(session))
+        conn.commit()
+        count = conn.execute("SELECT COUNT(*) FROM professor_snapshot").fetchone()[0]
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, path)
+    logging.info(f"Published snapshot of {count} professors to {path}")
+    return count
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """Loads the snapshot as a DataFrame with list-valued taxonomy columns."""
+    import pandas as pd  # Only the explorer needs pandas
+
+    conn = sqlite3.connect(path)
+    try:
+        df = pd.read_sql_query(f"SELECT {', '.join(COLUMNS)} FROM professor_snapshot ORDER BY name", conn)
+    finally:
+        conn.close()
+    # Missing text reads back as NaN, which is truthy; use empty strings instead
+    text_columns = [c for c in COLUMNS if c != "id" and c not in LIST_COLUMNS]
+    df[text_columns] = df[text_columns].fillna("")
+    for col in LIST_COLUMNS:
+        df[col] = df[col].map(json.loads)
+    return df
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    Session = init_db()
+    session = Session()
+    publish_snapshot(session)
+    session.close()
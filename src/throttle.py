@@ -0,0 +1,161 @@
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+import metrics
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+RETRY_STATUSES = (429, 503)
+
+# Fraction of the current rate added after a window of fast responses
+RATE_STEP = 0.1
+
+
+def parse_retry_after(value):
+    """Returns the Retry-After header as seconds (it may be a number or an HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostBudget:
+    """
+    Request budget for a single host.
+    The allowed rate grows by RATE_STEP of itself, at most once per delay
+    window, while the host answers quickly, and is halved on errors or slow
+    responses, bounded by robots Crawl-delay. Recovery after a backoff takes
+    many windows instead of a single request.
+    """
+
+    def __init__(self, min_delay, max_delay, target_latency, crawl_delay=None):
+        self.floor = max(min_delay, crawl_delay or 0)
+        self.max_delay = max(max_delay, self.floor)
+        self.target_latency = target_latency
+        self.delay = max(1.0, self.floor)
+        self.next_allowed = 0.0
+        self.last_change = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Claims the next slot and returns how long the caller has to wait for it."""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_allowed)
+            self.next_allowed = start + self.delay
+            return start - now
+
+    def success(self, latency):
+        with self.lock:
+            now = time.monotonic()
+            if latency > self.target_latency:
+                self.delay = min(self.max_delay, self.delay * 2)
+                self.last_change = now
+            elif now - self.last_change >= self.delay:
+                # One small increase of the rate (requests/second) per window
+                rate = (1 + RATE_STEP) / self.delay
+                self.delay = max(self.floor, 1 / rate)
+                self.last_change = now
+
+    def failure(self, retry_after=None):
+        with self.lock:
+            self.delay = min(self.max_delay, max(self.delay * 2, self.floor))
+            self.last_change = time.monotonic()
+            if retry_after is not None:
+                retry_after = min(retry_after, self.max_delay)
+                self.next_allowed = max(self.next_allowed, time.monotonic() + retry_after)
+
+
+class HostScheduler:
+    """Spaces out requests per host instead of using fixed sleeps."""
+
+    def __init__(self, min_delay=0.1, max_delay=60, target_latency=2.0, max_retries=3, user_agent=USER_AGENT):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.user_agent = user_agent
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _crawl_delay(self, scheme, host):
+        robots_url = f"{scheme}://{host}/robots.txt"
+        try:
+            response = requests.get(robots_url, headers={"User-Agent": self.user_agent}, timeout=10)
+            if response.status_code != 200:
+                return None
+            parser = RobotFileParser()
+            parser.parse(response.text.splitlines())
+            return parser.crawl_delay(self.user_agent) or parser.crawl_delay("*")
+        except Exception as e:
+            logging.warning(f"Could not read {robots_url}: {e}")
+            return None
+
+    def budget(self, url):
+        parts = urlsplit(url)
+        with self.lock:
+            budget = self.hosts.get(parts.netloc)
+        if budget is None:
+            crawl_delay = self._crawl_delay(parts.scheme, parts.netloc)
+            if crawl_delay:
+                logging.info(f"{parts.netloc} asks for Crawl-delay: {crawl_delay}s")
+            budget = HostBudget(self.min_delay, self.max_delay, self.target_latency, crawl_delay)
+            with self.lock:
+                budget = self.hosts.setdefault(parts.netloc, budget)
+        return budget
+
+    def get(self, url, **kwargs):
+        """requests.get() that waits for the host's budget and retries on 429/503."""
+        budget = self.budget(url)
+        headers = {"User-Agent": self.user_agent}
+        headers.update(kwargs.pop("headers", None) or {})
+
+        for attempt in range(self.max_retries + 1):
+            wait = budget.reserve()
+            if wait > 0:
+                time.sleep(wait)
+
+            start = time.monotonic()
+            try:
+                response = requests.get(url, headers=headers, **kwargs)
+            except requests.RequestException:
+                budget.failure()
+                if attempt == self.max_retries:
+                    raise
+                metrics.incr("http_retries")
+                continue
+            latency = time.monotonic() - start
+
+            if response.status_code in RETRY_STATUSES:
+                if response.status_code == 429:
+                    metrics.incr("http_429")
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                budget.failure(retry_after)
+                if retry_after is not None and retry_after > budget.max_delay:
+                    # Not worth blocking the whole run for; let the caller handle the error
+                    logging.warning(f"{url} asks to retry after {retry_after:.0f}s, more than "
+                                    f"the {budget.max_delay:.0f}s limit; giving up on it")
+                    return response
+                if attempt == self.max_retries:
+                    return response
+                logging.warning(f"{response.status_code} from {url}, retrying (attempt {attempt+1})")
+                metrics.incr("http_retries")
+                continue
+
+            if response.status_code >= 500:
+                budget.failure()
+            else:
+                budget.success(latency)
+            return response
@@ -0,0 +1,222 @@
+"""
+Moves the faculty dataset between databases without re-scraping.
+
+    python src/transfer.py export data/faculty_v2.db backup.jsonl
+    python src/transfer.py load backup.jsonl data/staging.db
+
+Files ending in .jsonl/.ndjson hold one {"table": ..., "row": ...} record per
+line; any other path is treated as a directory of <table>.parquet files
+(requires pyarrow). Both directions stream in batches, so memory stays flat.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+
+from sqlalchemy import create_engine, inspect, select, func, Integer
+
+from database import Base, init_db
+
+BATCH_SIZE = 1000
+
+# Parents before links, so a load never references a row that is not there yet
+TABLE_ORDER = [
+    "industries", "sectors", "areas_of_interest", "professors",
+    "professor_industries", "professor_sectors", "professor_areas_of_interest",
+]
+IMAGES = "images"
+
+
+def db_url(path):
+    return path if "://" in path else f"sqlite:///{path}"
+
+
+def is_ndjson(path):
+    return path.endswith((".jsonl", ".ndjson"))
+
+
+def file_digest(path):
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def iter_tables(engine):
+    """Yields (table_name, batch_of_row_dicts) for every table, then the image manifest."""
+    inspector = inspect(engine)
+    with engine.connect() as conn:
+        for name in TABLE_ORDER:
+            table = Base.metadata.tables[name]
+            # Older databases may not have every table or column yet
+            if not inspector.has_table(name):
+                logging.warning(f"Source has no {name} table; skipping it")
+                continue
+            existing = {c["name"] for c in inspector.get_columns(name)}
+            columns = [c for c in table.columns if c.name in existing]
+            result = conn.execution_options(yield_per=BATCH_SIZE).execute(
+                select(*columns).order_by(*table.primary_key.columns))
+            for partition in result.partitions():
+                yield name, [dict(row._mapping) for row in partition]
+
+        professors = Base.metadata.tables["professors"]
+        result = conn.execution_options(yield_per=BATCH_SIZE).execute(
+            select(professors.c.id, professors.c.image_url)
+            .where(professors.c.image_url != None)
+            .order_by(professors.c.id))
+        for partition in result.partitions():
+            batch = []
+            for prof_id, path in partition:
+                exists = os.path.exists(path)
+                batch.append({
+                    "professor_id": prof_id,
+                    "path": path,
+                    "size": os.path.getsize(path) if exists else None,
+                    "sha1": file_digest(path) if exists else None,
+                })
+            yield IMAGES, batch
+
+
+def arrow_schema(name):
+    import pyarrow as pa
+
+    if name == IMAGES:
+        return pa.schema([("professor_id", pa.int64()), ("path", pa.string()),
+                          ("size", pa.int64()), ("sha1", pa.string())])
+    table = Base.metadata.tables[name]
+    return pa.schema([(c.name, pa.int64() if isinstance(c.type, Integer) else pa.string())
+                      for c in table.columns])
+
+
+def export_data(source, dest):
+    engine = create_engine(db_url(source))
+    counts = {}
+
+    if is_ndjson(dest):
+        with open(dest, "w", encoding="utf-8") as f:
+            for name, batch in iter_tables(engine):
+                for row in batch:
+                    f.write(json.dumps({"table": name, "row": row}, ensure_ascii=False) + "\n")
+                counts[name] = counts.get(name, 0) + len(batch)
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(dest, exist_ok=True)
+        writers = {}
+        try:
+            for name, batch in iter_tables(engine):
+                if name not in writers:
+                    writers[name] = pq.ParquetWriter(os.path.join(dest, f"{name}.parquet"), arrow_schema(name))
+                writers[name].write_table(pa.Table.from_pylist(batch, schema=arrow_schema(name)))
+                counts[name] = counts.get(name, 0) + len(batch)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+    engine.dispose()
+    for name, count in counts.items():
+        logging.info(f"Exported {count} rows from {name}")
+    return counts
+
+
+def iter_source(source):
+    """Yields (table_name, row_dict) from an NDJSON file or a Parquet directory."""
+    if is_ndjson(source):
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record["table"], record["row"]
+    else:
+        import pyarrow.parquet as pq
+
+        for name in TABLE_ORDER + [IMAGES]:
+            path = os.path.join(source, f"{name}.parquet")
+            if not os.path.exists(path):
+                continue
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=BATCH_SIZE):
+                for row in batch.to_pylist():
+                    yield name, row
+
+
+def load_data(source, dest):
+    """Bulk-loads an export into an empty database in a single transaction."""
+    init_db(db_url(dest))
+    engine = create_engine(db_url(dest))
+    professors = Base.metadata.tables["professors"]
+    counts = {}
+    missing_images = 0
+
+    with engine.begin() as conn:
+        existing = conn.execute(select(func.count()).select_from(professors)).scalar()
+        if existing:
+            raise ValueError(f"{dest} already has {existing} professors; load into a fresh database.")
+
+        pending = {}
+
+        def flush(name):
+            rows = pending.pop(name, [])
+            if rows:
+                conn.execute(Base.metadata.tables[name].insert(), rows)
+                counts[name] = counts.get(name, 0) + len(rows)
+
+        current = None
+        for name, row in iter_source(source):
+            if name != current:
+                # Tables arrive one after another; finish the previous one first
+                if current in pending:
+                    flush(current)
+                current = name
+            if name == IMAGES:
+                if row["sha1"] and (not os.path.exists(row["path"]) or file_digest(row["path"]) != row["sha1"]):
+                    missing_images += 1
+                    logging.warning(f"Image missing or changed: {row['path']}")
+                continue
+            if name not in Base.metadata.tables:
+                raise ValueError(f"Unknown table in export: {name}")
+            pending.setdefault(name, []).append(row)
+            if len(pending[name]) >= BATCH_SIZE:
+                flush(name)
+
+        for name in list(pending):
+            flush(name)
+
+    engine.dispose()
+    for name, count in counts.items():
+        logging.info(f"Loaded {count} rows into {name}")
+    if missing_images:
+        logging.warning(f"{missing_images} images in the manifest are missing or differ on disk.")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or bulk-load the faculty dataset.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Stream a database to NDJSON or Parquet")
+    export_parser.add_argument("source", help="Database path or SQLAlchemy URL")
+    export_parser.add_argument("dest", help="Output .jsonl/.ndjson file or Parquet directory")
+
+    load_parser = subparsers.add_parser("load", help="Bulk-load an export into a fresh database")
+    load_parser.add_argument("source", help="Input .jsonl/.ndjson file or Parquet directory")
+    load_parser.add_argument("dest", help="Database path or SQLAlchemy URL")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "export":
+            export_data(args.source, args.dest)
+        else:
+            load_data(args.source, args.dest)
+    except Exception as e:
+        logging.error(f"{args.command} failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
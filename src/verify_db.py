@@ -1,14 +1,15 @@
 import sqlite3
 import os
+import sys
 
-DB_PATH = "data/faculty.db"
+DB_PATH = "data/faculty_v2.db"
 
-def check_db():
-    if not os.path.exists(DB_PATH):
-        print(f"Database not found at {DB_PATH}")
+def check_db(db_path=DB_PATH):
+    if not os.path.exists(db_path):
+        print(f"Database not found at {db_path}")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     print("--- Professors ---")
@@ -38,4 +39,5 @@ def check_db():
     conn.close()
 
 if __name__ == "__main__":
-    check_db()
+    # Optional path argument: python src/verify_db.py data/staging.db
+    check_db(sys.argv[1] if len(sys.argv) > 1 else DB_PATH)